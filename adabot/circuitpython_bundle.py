@@ -25,9 +25,13 @@
     remote, and a new release is made.
 """
 
+import collections
+import concurrent.futures
 from datetime import date
+import functools
 from io import StringIO
 import os
+import re
 import shlex
 import subprocess
 
@@ -37,6 +41,7 @@ import sh
 from sh.contrib import git
 
 from adabot import github_requests as github
+from adabot import pypi_requests as pypi
 from adabot.lib import common_funcs
 
 REDIS = None
@@ -47,9 +52,44 @@ else:
 
 BUNDLES = ["Adafruit_CircuitPython_Bundle", "CircuitPython_Community_Bundle"]
 
+# Number of submodules to clone/fetch in parallel.
+SUBMODULE_JOBS = 8
+# Number of concurrent GitHub API requests when resolving contributors. All
+# lookups share one pool of this size, matching the GitHub connection pool.
+CONTRIBUTOR_LOOKUP_JOBS = github.POOL_SIZE
+# Seconds to cache whether a library is on PyPI.
+PYPI_CACHE_TTL = 24 * 60 * 60
+# Number of updated libraries to gather release notes for concurrently.
+RELEASE_JOBS = 8
+
+# Matches the header of each submodule in `git diff --submodule=log`.
+SUBMODULE_LOG_RE = re.compile(
+    r"^Submodule (?P<path>\S+) (?P<old>[0-9a-f]+)\.\.\.?(?P<new>[0-9a-f]+).*$", re.M
+)
+# Matches the lines of `git diff --submodule=short` needed to find the
+# commit range of each updated submodule.
+SUBMODULE_DIFF_RE = re.compile(
+    r"^(?:diff --git a/\S+ b/(?P<path>\S+)|index (?P<index>\S+)|\+Subproject commit )",
+    re.M,
+)
+
+
+def git_supports_jobs():
+    """Whether the installed git supports `--jobs` for submodule
+    updates and recursive fetches (added in git 2.8).
+    """
+    output = StringIO()
+    git("--version", _out=output)
+    version = re.search(r"(\d+)\.(\d+)", output.getvalue())
+    if not version:
+        return False
+    return (int(version.group(1)), int(version.group(2))) >= (2, 8)
+
 
 def fetch_bundle(bundle, bundle_path):
-    """Clones `bundle` to `bundle_path`"""
+    """Clones `bundle` to `bundle_path`. Blobs are fetched on demand, since
+    only the commit and tree history is needed to update submodules.
+    """
     if not os.path.isdir(bundle_path):
         os.makedirs(bundle_path, exist_ok=True)
         if "GITHUB_WORKSPACE" in os.environ:
@@ -58,20 +98,60 @@ def fetch_bundle(bundle, bundle_path):
                 + os.environ["ADABOT_GITHUB_ACCESS_TOKEN"]
                 + "@github.com/adafruit/"
             )
-            git.clone("-o", "adafruit", git_url + bundle + ".git", bundle_path)
+            git.clone(
+                "--filter=blob:none",
+                "-o",
+                "adafruit",
+                git_url + bundle + ".git",
+                bundle_path,
+            )
         else:
             git.clone(
+                "--filter=blob:none",
                 "-o",
                 "adafruit",
                 "https://github.com/adafruit/" + bundle + ".git",
                 bundle_path,
             )
-    working_directory = os.getcwd()
-    os.chdir(bundle_path)
-    git.pull()
-    git.submodule("init")
-    git.submodule("update")
-    os.chdir(working_directory)
+    git.pull(_cwd=bundle_path)
+    if git_supports_jobs():
+        git.submodule(
+            "update", "--init", "--jobs", str(SUBMODULE_JOBS), _cwd=bundle_path
+        )
+    else:
+        git.submodule("init", _cwd=bundle_path)
+        git.submodule("update", _cwd=bundle_path)
+
+
+def repo_url_name(url):
+    """The repository name at the end of `url`, without any extension."""
+    base = url.rpartition("/")[2]
+    name, dot, _ = base.rpartition(".")
+    return name if dot else base
+
+
+def get_pypi_status(names):
+    """Check which of the libraries in `names` are on PyPI. Results are
+    cached in Redis for `PYPI_CACHE_TTL` seconds, so the library list is
+    not rebuilt with one PyPI request per library on every run. Only
+    definite answers (found or not found) are cached; any other response
+    is treated as not on PyPI for this run only.
+    """
+    on_pypi = {}
+    if not names:
+        return on_pypi
+    cached = REDIS.mget(["pypi:" + name for name in names])
+    pipeline = REDIS.pipeline()
+    for name, status in zip(names, cached):
+        if status is None:
+            response = pypi.get("/pypi/" + name + "/json")
+            on_pypi[name] = response.status_code == 200
+            if response.status_code in (200, 404):
+                pipeline.set("pypi:" + name, int(on_pypi[name]), ex=PYPI_CACHE_TTL)
+        else:
+            on_pypi[name] = status == b"1"
+    pipeline.execute()
+    return on_pypi
 
 
 # pylint: disable=too-many-locals
@@ -91,21 +171,22 @@ def check_lib_links_md(bundle_path):
         with open(
             os.path.join(bundle_path, "circuitpython_library_list.md"), "r"
         ) as lib_list:
-            read_lines = lib_list.read().splitlines()
+            read_lines = set(lib_list.read().splitlines())
     except OSError:
-        read_lines = []
+        read_lines = set()
+
+    on_pypi = get_pypi_status(
+        [repo_url_name(submodule[1]["url"]) for submodule in submodules_list]
+    )
 
     write_drivers = []
     write_helpers = []
     updates_made = []
     for submodule in submodules_list:
         url = submodule[1]["url"]
-        url_name = url[
-            url.rfind("/")
-            + 1 : (url.rfind(".") if url.rfind(".") > url.rfind("/") else len(url))
-        ]
+        url_name = repo_url_name(url)
         pypi_name = ""
-        if common_funcs.repo_is_on_pypi({"name": url_name}):
+        if on_pypi[url_name]:
             pypi_name = " ([PyPi](https://pypi.org/project/{}))".format(
                 url_name.replace("_", "-").lower()
             )
@@ -136,39 +217,55 @@ def check_lib_links_md(bundle_path):
     with open(
         os.path.join(bundle_path, "circuitpython_library_list.md"), "w"
     ) as md_file:
-        md_file.write("\n".join(lib_list_header))
-        for line in sorted(write_drivers):
-            md_file.write(line + "\n")
-        md_file.write("\n## Helpers:\n")
-        for line in sorted(write_helpers):
-            md_file.write(line + "\n")
+        md_file.writelines(
+            ["\n".join(lib_list_header)]
+            + [line + "\n" for line in sorted(write_drivers)]
+            + ["\n## Helpers:\n"]
+            + [line + "\n" for line in sorted(write_helpers)]
+        )
 
     return updates_made
 
 
-class Submodule:
-    """Context managing class to use with git submodules."""
-
-    def __init__(self, directory):
-        self.directory = directory
-        self.original_directory = os.path.abspath(os.getcwd())
-
-    def __enter__(self):
-        os.chdir(self.directory)
-
-    def __exit__(self, exc_type, exc_value, traceback):
-        os.chdir(self.original_directory)
-
-
-def commit_to_tag(repo_path, commit):
-    """Fetch the tag for `commit`."""
-    with Submodule(repo_path):
-        try:
-            output = StringIO()
-            git.describe("--tags", "--exact-match", commit, _out=output)
-            commit = output.getvalue().strip()
-        except sh.ErrorReturnCode_128:
-            pass
+def get_submodule_tags(bundle_path):
+    """Map the path of each submodule in `bundle_path` to a dict of
+    `{commit: tag}` for all of its tags. This uses a single
+    `git submodule foreach`, rather than a `git describe` per commit.
+    """
+    output = StringIO()
+    git.submodule(
+        "foreach",
+        "--quiet",
+        'git for-each-ref --format="$sm_path %(objectname) %(*objectname) '
+        '%(refname:short)" refs/tags',
+        _out=output,
+        _cwd=bundle_path,
+    )
+    tag_map = {}
+    for line in output.getvalue().splitlines():
+        # Annotated tags also list the tagged commit, lightweight tags don't.
+        path, *commits, tag = line.split()
+        for commit in commits:
+            tag_map.setdefault(os.path.join(bundle_path, path), {})[commit] = tag
+    return tag_map
+
+
+def commit_to_tag(repo_path, commit, tag_map=None):
+    """Fetch the tag for `commit`. When `tag_map` (from `get_submodule_tags`)
+    is given, the tag is looked up there instead of running `git describe`.
+    """
+    if tag_map is not None:
+        # `commit` may be abbreviated, as in `git diff --submodule` output.
+        for tagged_commit, tag in tag_map.get(repo_path, {}).items():
+            if tagged_commit.startswith(commit):
+                return tag
+        return commit
+    try:
+        output = StringIO()
+        git.describe("--tags", "--exact-match", commit, _out=output, _cwd=repo_path)
+        commit = output.getvalue().strip()
+    except sh.ErrorReturnCode_128:
+        pass
     return commit
 
 
@@ -183,26 +280,61 @@ def repo_version():
     return version.getvalue().strip()
 
 
-def repo_sha():
-    """The SHA of the repo."""
+def repo_sha(repo_path):
+    """The SHA of the repo at `repo_path`."""
     version = StringIO()
-    git.log(pretty="format:%H", n=1, _out=version)
+    git.log(pretty="format:%H", n=1, _out=version, _cwd=repo_path)
     return version.getvalue().strip()
 
 
 def repo_remote_url(repo_path):
     """The URL for the remote branch."""
-    with Submodule(repo_path):
-        output = StringIO()
-        git.remote("get-url", "origin", _out=output)
-        return output.getvalue().strip()
+    output = StringIO()
+    git.remote("get-url", "origin", _out=output, _cwd=repo_path)
+    return output.getvalue().strip()
+
+
+def get_submodule_urls(bundle_path):
+    """Map each submodule path in `bundle_path` to its URL, as listed in
+    `.gitmodules`. This avoids running `git remote` in every submodule.
+    """
+    try:
+        with open(os.path.join(bundle_path, ".gitmodules"), "r") as gitmodules:
+            submodules = common_funcs.parse_gitmodules(gitmodules.read())
+    except OSError:
+        return {}
+    return {
+        variables["path"]: variables["url"]
+        for _, variables in submodules
+        if "path" in variables and "url" in variables
+    }
+
+
+def parse_submodule_log(output):
+    """Parse `git diff --submodule=log` output into a dict mapping each
+    submodule path to `(old_commit, new_commit, summary)`, where `summary`
+    is the list of commits git prints below the submodule's header.
+    """
+    updates = {}
+    headers = list(SUBMODULE_LOG_RE.finditer(output))
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        end = next_header.start() if next_header else len(output)
+        updates[header.group("path")] = (
+            header.group("old"),
+            header.group("new"),
+            output[header.end() : end].strip("\n"),
+        )
+    return updates
 
 
 def update_bundle(bundle_path):
     """Process all libraries in the bundle, and update their version if necessary."""
-    working_directory = os.path.abspath(os.getcwd())
-    os.chdir(bundle_path)
-    git.submodule("foreach", "git", "fetch")
+    if git_supports_jobs():
+        git.fetch(
+            "--recurse-submodules=yes", "--jobs", str(SUBMODULE_JOBS), _cwd=bundle_path
+        )
+    else:
+        git.submodule("foreach", "git", "fetch", _cwd=bundle_path)
     # Regular release tags are 'x.x.x'. Exclude tags that are alpha or beta releases.
     # They will contain a '-' in the tag, such as '3.0.0-beta.5'.
     # --exclude must be before --tags.
@@ -213,31 +345,35 @@ def update_bundle(bundle_path):
             "`git rev-list --exclude='*-*' --tags --max-count=1`'"
         ),
         stdout=subprocess.DEVNULL,
+        cwd=bundle_path,
     )
+    submodule_urls = get_submodule_urls(bundle_path)
+    tag_map = get_submodule_tags(bundle_path)
     status = StringIO()
-    git.status("--short", _out=status)
+    git.status("--short", _out=status, _cwd=bundle_path)
     updates = []
     status = status.getvalue().strip()
     if status:
+        # Compute the tag difference of every updated submodule at once.
+        diff = StringIO()
+        git.diff("--submodule=log", "libraries", _out=diff, _cwd=bundle_path)
+        submodule_log = parse_submodule_log(diff.getvalue())
         for status_line in status.split("\n"):
             action, directory = status_line.split()
             if directory.endswith("library_list.md"):
                 continue
-            if action != "M" or not directory.startswith("libraries"):
+            if (
+                action != "M"
+                or not directory.startswith("libraries")
+                or directory not in submodule_log
+            ):
                 raise RuntimeError("Unsupported updates")
-
-            # Compute the tag difference.
-            diff = StringIO()
-            git.diff("--submodule=log", directory, _out=diff)
-            diff_lines = diff.getvalue().split("\n")
-            commit_range = diff_lines[0].split()[2]
-            commit_range = commit_range.strip(":").split(".")
-            old_commit = commit_to_tag(directory, commit_range[0])
-            new_commit = commit_to_tag(directory, commit_range[-1])
-            url = repo_remote_url(directory)
-            summary = "\n".join(diff_lines[1:-1])
+            old_commit, new_commit, summary = submodule_log[directory]
+            submodule_path = os.path.join(bundle_path, directory)
+            old_commit = commit_to_tag(submodule_path, old_commit, tag_map)
+            new_commit = commit_to_tag(submodule_path, new_commit, tag_map)
+            url = submodule_urls.get(directory) or repo_remote_url(submodule_path)
             updates.append((url[:-4], old_commit, new_commit, summary))
-    os.chdir(working_directory)
     lib_list_updates = check_lib_links_md(bundle_path)
     if lib_list_updates:
         updates.append(
@@ -259,9 +395,7 @@ def update_bundle(bundle_path):
 
 def commit_updates(bundle_path, update_info):
     """Commit changes to `bundle_path` using `update_info` for the commit message."""
-    working_directory = os.path.abspath(os.getcwd())
     message = ["Automated update by Adabot (adafruit/adabot@{})".format(repo_version())]
-    os.chdir(bundle_path)
     for url, old_commit, new_commit, summary in update_info:
         url_parts = url.split("/")
         user, repo = url_parts[-2:]
@@ -272,53 +406,97 @@ def commit_updates(bundle_path, update_info):
             )
         )
     message = "\n\n".join(message)
-    git.add(".")
-    git.commit(message=message)
-    os.chdir(working_directory)
+    git.add(".", _cwd=bundle_path)
+    git.commit(message=message, _cwd=bundle_path)
 
 
 def push_updates(bundle_path):
     """Push bundle updates to the remote."""
-    working_directory = os.path.abspath(os.getcwd())
-    os.chdir(bundle_path)
-    git.push()
-    os.chdir(working_directory)
+    git.push(_cwd=bundle_path)
+
+
+def get_github_commit(repo, sha):
+    """Get the GitHub API commit info for `sha` in `repo`, or None if the
+    request failed (e.g. it was rate limited).
+    """
+    response = github.get("/repos/" + repo + "/commits/" + sha)
+    if not response.ok:
+        return None
+    return response.json()
+
 
+# pylint: disable=too-many-branches
+def get_contributors(repo, commit_range, repo_path, executor=None):
+    """Get a Counter of the commits by each contributor to `repo`, checked
+    out at `repo_path`, for the `commit_range`. Unknown users are looked up
+    on GitHub using `executor`, so concurrent callers can share one pool.
+    """
+    if executor is None:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=CONTRIBUTOR_LOOKUP_JOBS
+        ) as lookup_executor:
+            return get_contributors(repo, commit_range, repo_path, lookup_executor)
 
-def get_contributors(repo, commit_range):
-    """Get contributors to `repo` for the `commit_range`."""
     output = StringIO()
     try:
-        git.log("--pretty=tformat:%H,%ae,%ce", commit_range, _out=output)
+        git.log(
+            "-z",
+            "--format=%H%x00%ae%x00%ce",
+            commit_range,
+            _out=output,
+            _cwd=repo_path,
+        )
     except sh.ErrorReturnCode_128:
         print("Skipping contributors for:", repo)
-    output = output.getvalue().strip()
-    contributors = {}
-    if not output:
+    contributors = collections.Counter()
+    if not output.getvalue():
         return contributors
-    for log_line in output.split("\n"):
-        sha, author_email, committer_email = log_line.split(",")
-        author = REDIS.get("github_username:" + author_email)
-        committer = REDIS.get("github_username:" + committer_email)
-        if not author or not committer:
-            github_commit_info = github.get("/repos/" + repo + "/commits/" + sha)
-            github_commit_info = github_commit_info.json()
-            if github_commit_info["author"]:
-                author = github_commit_info["author"]["login"]
-                REDIS.set("github_username:" + author_email, author)
-            if github_commit_info["committer"]:
-                committer = github_commit_info["committer"]["login"]
-                REDIS.set("github_username:" + committer_email, committer)
-        else:
-            author = author.decode("utf-8")
-            committer = committer.decode("utf-8")
+    # Commits and their fields are all NUL separated, so a single split
+    # parses the whole log, whatever characters the emails contain. Only the
+    # final terminator is dropped, since a field itself may be empty.
+    fields = output.getvalue().split("\0")[:-1]
+    commits = [fields[i : i + 3] for i in range(0, len(fields), 3)]
+
+    # Resolve every known email address with a single round trip to Redis.
+    emails = list(
+        {email for _, author, committer in commits for email in (author, committer)}
+    )
+    usernames = {}
+    cached = REDIS.mget(["github_username:" + email for email in emails])
+    for email, username in zip(emails, cached):
+        if username:
+            usernames[email] = username.decode("utf-8")
+
+    # Look up one commit per unknown email address on GitHub, concurrently.
+    lookups = {}
+    seen = set(usernames)
+    for sha, author_email, committer_email in commits:
+        if author_email not in seen or committer_email not in seen:
+            lookups[sha] = (author_email, committer_email)
+            seen.update((author_email, committer_email))
+    pipeline = REDIS.pipeline()
+    commit_info = executor.map(functools.partial(get_github_commit, repo), lookups)
+    for (author_email, committer_email), github_commit_info in zip(
+        lookups.values(), commit_info
+    ):
+        if not github_commit_info:
+            continue
+        if github_commit_info["author"]:
+            usernames[author_email] = github_commit_info["author"]["login"]
+            pipeline.set("github_username:" + author_email, usernames[author_email])
+        if github_commit_info["committer"]:
+            usernames[committer_email] = github_commit_info["committer"]["login"]
+            pipeline.set(
+                "github_username:" + committer_email, usernames[committer_email]
+            )
+    # Store all of the new usernames in a single round trip.
+    pipeline.execute()
 
+    for _, author_email, committer_email in commits:
+        author = usernames.get(author_email)
+        committer = usernames.get(committer_email)
         if committer_email == "noreply@github.com":
             committer = None
-        if author and author not in contributors:
-            contributors[author] = 0
-        if committer and committer not in contributors:
-            contributors[committer] = 0
         if author:
             contributors[author] += 1
         if committer and committer != author:
@@ -326,6 +504,23 @@ def get_contributors(repo, commit_range):
     return contributors
 
 
+def parse_submodule_diff(output):
+    """Parse `git diff --submodule=short` output into a list of
+    `(path, commit_range)` for each submodule with a new commit.
+    """
+    changes = []
+    current_submodule = None
+    current_index = None
+    for match in SUBMODULE_DIFF_RE.finditer(output):
+        if match.group("path"):
+            current_submodule = match.group("path")
+        elif match.group("index"):
+            current_index = match.group("index")
+        else:
+            changes.append((current_submodule, current_index))
+    return changes
+
+
 def repo_name(url):
     """Strips off .git and splits on /"""
     if url.endswith(".git"):
@@ -334,67 +529,82 @@ def repo_name(url):
     return url[-2] + "/" + url[-1]
 
 
-# TODO: turn `master_list` into a set()?
 def add_contributors(master_list, additions):
-    """Adds contributors to `master_list` if not already in the list."""
-    for contributor in additions:
-        if contributor not in master_list:
-            master_list[contributor] = 0
-        master_list[contributor] += additions[contributor]
+    """Adds the commit counts in `additions` to the `master_list` Counter."""
+    master_list.update(additions)
+
+
+# pylint: disable=too-many-arguments
+def get_submodule_release(
+    bundle_path, directory, commit_range, repo_url, tag_map, lookup_executor
+):
+    """Get the repo URL, release tag and contributors of the submodule at
+    `directory` for the `commit_range`. Safe to run concurrently, since it
+    does not change the working directory. GitHub lookups are made on the
+    shared `lookup_executor`, which caps the total number of requests.
+    """
+    submodule_path = os.path.join(bundle_path, directory)
+    if not repo_url:
+        repo_url = repo_remote_url(submodule_path)
+    new_commit = commit_range.split(".")[-1]
+    release_tag = commit_to_tag(submodule_path, new_commit, tag_map)
+    contributors = get_contributors(
+        repo_name(repo_url), commit_range, submodule_path, lookup_executor
+    )
+    return repo_url, release_tag, contributors
 
 
 # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 def new_release(bundle, bundle_path):
     """Creates a new release for `bundle`."""
-    working_directory = os.path.abspath(os.getcwd())
-    os.chdir(bundle_path)
     print(bundle)
     current_release = github.get("/repos/adafruit/{}/releases/latest".format(bundle))
     last_tag = current_release.json()["tag_name"]
-    contributors = get_contributors("adafruit/" + bundle, last_tag + "..")
+    contributors = get_contributors("adafruit/" + bundle, last_tag + "..", bundle_path)
     added_submodules = []
     updated_submodules = []
     repo_links = {}
+    submodule_urls = get_submodule_urls(bundle_path)
 
     output = StringIO()
-    git.diff("--submodule=short", last_tag + "..", _out=output)
+    git.diff("--submodule=short", last_tag + "..", _out=output, _cwd=bundle_path)
     output = output.getvalue().strip()
     if not output:
         print("Everything is already released.")
         return
-    current_submodule = None
-    current_index = None
-    # pylint: disable=no-else-continue
-    for line in output.split("\n"):
-        if line.startswith("diff"):
-            current_submodule = line.split()[-1][len("b/") :]
-            continue
-        elif "index" in line:
-            current_index = line
-            continue
-        elif not line.startswith("+Subproject"):
-            continue
-
-        # We have a candidate submodule change.
-        directory = current_submodule
-        commit_range = current_index.split()[1]
-        library_name = directory.split("/")[-1]
-        if commit_range.startswith("0000000"):
-            added_submodules.append(library_name)
-            commit_range = commit_range.split(".")[-1]
-        elif commit_range.endswith("0000000"):
-            # For now, skip documenting deleted modules.
-            continue
-        else:
-            updated_submodules.append(library_name)
-
-        repo_url = repo_remote_url(directory)
-
-        new_commit = commit_range.split(".")[-1]
-        release_tag = commit_to_tag(directory, new_commit)
-        with Submodule(directory):
-            submodule_contributors = get_contributors(repo_name(repo_url), commit_range)
-            add_contributors(contributors, submodule_contributors)
+    tag_map = get_submodule_tags(bundle_path)
+    releases = {}
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=CONTRIBUTOR_LOOKUP_JOBS
+    ) as lookup_executor:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=RELEASE_JOBS
+        ) as executor:
+            for directory, commit_range in parse_submodule_diff(output):
+                library_name = directory.split("/")[-1]
+                if commit_range.startswith("0000000"):
+                    added_submodules.append(library_name)
+                    commit_range = commit_range.split(".")[-1]
+                elif commit_range.endswith("0000000"):
+                    # For now, skip documenting deleted modules.
+                    continue
+                else:
+                    updated_submodules.append(library_name)
+
+                releases[library_name] = executor.submit(
+                    get_submodule_release,
+                    bundle_path,
+                    directory,
+                    commit_range,
+                    submodule_urls.get(directory),
+                    tag_map,
+                    lookup_executor,
+                )
+
+    # Merge in submission order, so the release notes don't depend on timing.
+    for library_name, release in releases.items():
+        repo_url, release_tag, submodule_contributors = release.result()
+        add_contributors(contributors, submodule_contributors)
         repo_links[library_name] = repo_url[:-4] + "/releases/" + release_tag
 
     release_description = []
@@ -412,8 +622,7 @@ def new_release(bundle, bundle_path):
 
     release_description.append("")
 
-    contributors = sorted(contributors, key=contributors.__getitem__, reverse=True)
-    contributors = ["@" + x for x in contributors]
+    contributors = ["@" + x for x, _ in contributors.most_common()]
 
     release_description.append(
         "As always, thank you to all of our contributors: " + ", ".join(contributors)
@@ -438,7 +647,7 @@ def new_release(bundle, bundle_path):
 
     release = {
         "tag_name": "{0:%Y%m%d}".format(date.today()),
-        "target_commitish": repo_sha(),
+        "target_commitish": repo_sha(bundle_path),
         "name": "{0:%B} {0:%d}, {0:%Y} auto-release".format(date.today()),
         "body": "\n".join(release_description),
         "draft": False,
@@ -454,8 +663,6 @@ def new_release(bundle, bundle_path):
         print(response.request.url)
         print(response.text)
 
-    os.chdir(working_directory)
-
 
 if __name__ == "__main__":
     bundles_dir = os.path.abspath(".bundles")
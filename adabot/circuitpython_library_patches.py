@@ -23,14 +23,18 @@
 """Adabot utility for applying patches to all CircuitPython Libraries."""
 
 import argparse
+import concurrent.futures
+import functools
 import os
+import re
 import shutil
 import sys
+import threading
 
-import requests
 import sh
 from sh.contrib import git
 
+from adabot import github_requests as github
 from adabot.lib import common_funcs
 
 
@@ -40,8 +44,12 @@ patch_directory = working_directory + "/patches/"
 repos = []
 check_errors = []
 apply_errors = []
+errors_lock = threading.Lock()
 stats = []
 
+PATCH_SUBJECT_RE = re.compile(r"^Subject: \[PATCH[^\]]*\]\s*(.*(?:\n[ \t].*)*)", re.M)
+DIFF_HEADER_RE = re.compile(r"^diff --git a/(\S+) b/(\S+)$", re.M)
+
 """
 Setup the command line argument parsing object.
 """
@@ -91,6 +99,15 @@ cli_parser.add_argument(
     action="store_true",
     dest="run_local",
 )
+cli_parser.add_argument(
+    "-j",
+    "--jobs",
+    help="Number of libraries to check and patch concurrently. Defaults to 8.",
+    metavar="JOBS",
+    default=8,
+    type=int,
+    dest="jobs",
+)
 
 
 def get_repo_list():
@@ -117,9 +134,7 @@ def get_patches(run_local):
     """
     return_list = []
     if not run_local:
-        contents = requests.get(
-            "https://api.github.com/repos/adafruit/adabot/contents/patches"
-        )
+        contents = github.get("/repos/adafruit/adabot/contents/patches")
         if contents.ok:
             for patch in contents.json():
                 patch_name = patch["name"]
@@ -132,6 +147,86 @@ def get_patches(run_local):
 
     return return_list
 
+
+def add_error(error_list, repo_name, patch_name, error_text):
+    """Record a check or apply error. Repos are processed concurrently, so
+    appends are serialized with `errors_lock`.
+    """
+    with errors_lock:
+        error_list.append(
+            dict(repo_name=repo_name, patch_name=patch_name, error=error_text)
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_patch_subject(patch_filepath):
+    """The commit subject of the patch in `patch_filepath`, without the
+    `[PATCH]` prefix. The header is only read once per patch, however many
+    repos it is applied to.
+    """
+    with open(patch_filepath) as patchfile:
+        header = patchfile.read(4096)
+    subject = PATCH_SUBJECT_RE.search(header)
+    if not subject:
+        raise ValueError("No patch subject found in {}".format(patch_filepath))
+    # Long subjects are folded onto indented continuation lines.
+    return " ".join(line.strip() for line in subject.group(1).splitlines())
+
+
+@functools.lru_cache(maxsize=None)
+def get_patch_targets(patch_filepath):
+    """The files that the patch in `patch_filepath` modifies, and the files
+    it creates, as a tuple of two frozensets.
+    """
+    with open(patch_filepath) as patchfile:
+        content = patchfile.read()
+    modified = set()
+    created = set()
+    for header in DIFF_HEADER_RE.finditer(content):
+        if content.startswith("new file mode", header.end() + 1):
+            created.add(header.group(2))
+        else:
+            modified.add(header.group(1))
+    return frozenset(modified), frozenset(created)
+
+
+def get_repo_files(repo_name):
+    """The paths of all files on the default branch of `repo_name`, using the
+    GitHub Trees API. Returns None if the full tree could not be listed.
+    """
+    try:
+        response = github.get(
+            "/repos/adafruit/" + repo_name + "/git/trees/HEAD", params={"recursive": 1}
+        )
+    except RuntimeError:
+        return None
+    if not response.ok:
+        return None
+    tree = response.json()
+    if tree.get("truncated"):
+        return None
+    return {item["path"] for item in tree["tree"] if item["type"] == "blob"}
+
+
+def filter_patches(patches, repo_files):
+    """Split `patches` into those that could apply to a repo containing
+    `repo_files` and those that can't: every file a patch modifies must
+    exist, and every file it creates must not. Files created by an earlier
+    patch count as existing for the later ones.
+    """
+    repo_files = set(repo_files)
+    candidates = []
+    skipped = []
+    for patch in patches:
+        modified, created = get_patch_targets(patch_directory + patch)
+        if modified <= repo_files and not created & repo_files:
+            candidates.append(patch)
+            repo_files |= created
+        else:
+            skipped.append(patch)
+    return candidates, skipped
+
+
 # pylint: disable=too-many-arguments
 def apply_patch(repo_directory, patch_filepath, repo, patch, flags, use_apply):
     """Apply the `patch` in `patch_filepath` to the `repo` in
@@ -143,16 +238,11 @@ def apply_patch(repo_directory, patch_filepath, repo, patch, flags, use_apply):
     to ensure that any passed flags that turn off apply (e.g. `--check`)
     are overridden.
     """
-    if not os.getcwd() == repo_directory:
-        os.chdir(repo_directory)
-
     if not use_apply:
         try:
-            git.am(flags, patch_filepath)
+            git.am(flags, patch_filepath, _cwd=repo_directory)
         except sh.ErrorReturnCode as err:
-            apply_errors.append(
-                dict(repo_name=repo, patch_name=patch, error=err.stderr)
-            )
+            add_error(apply_errors, repo, patch, err.stderr)
             return False
     else:
         apply_flags = ["--apply"]
@@ -160,30 +250,23 @@ def apply_patch(repo_directory, patch_filepath, repo, patch, flags, use_apply):
             if not flag == "--signoff":
                 apply_flags.append(flag)
         try:
-            git.apply(apply_flags, patch_filepath)
+            git.apply(apply_flags, patch_filepath, _cwd=repo_directory)
         except sh.ErrorReturnCode as err:
-            apply_errors.append(
-                dict(repo_name=repo, patch_name=patch, error=err.stderr)
-            )
+            add_error(apply_errors, repo, patch, err.stderr)
             return False
 
-        with open(patch_filepath) as patchfile:
-            for line in patchfile:
-                if "[PATCH]" in line:
-                    message = '"' + line[(line.find("]") + 2) :] + '"'
-                    break
         try:
-            git.commit("-a", "-m", message)
-        except sh.ErrorReturnCode as err:
-            apply_errors.append(
-                dict(repo_name=repo, patch_name=patch, error=err.stderr)
+            git.commit(
+                "-a", "-m", get_patch_subject(patch_filepath), _cwd=repo_directory
             )
+        except sh.ErrorReturnCode as err:
+            add_error(apply_errors, repo, patch, err.stderr)
             return False
 
     try:
-        git.push()
+        git.push(_cwd=repo_directory)
     except sh.ErrorReturnCode as err:
-        apply_errors.append(dict(repo_name=repo, patch_name=patch, error=err.stderr))
+        add_error(apply_errors, repo, patch, err.stderr)
         return False
     return True
 
@@ -197,6 +280,14 @@ def check_patches(repo, patches, flags, use_apply, dry_run):
     When `use_apply` is true, any flags except `--apply` are passed
     through to the check call. This ensures that the check call is
     representative of the actual apply call.
+
+    Patches that can't apply to the files listed by the GitHub Trees API
+    are skipped without cloning the `repo`. This is only done when `flags`
+    holds nothing besides `--signoff`, since other flags (e.g. `-p2` or
+    `--directory`) can change which files a patch touches.
+
+    Every git command is run with `_cwd` rather than changing the process
+    working directory, so that multiple repos can be checked concurrently.
     """
     applied = 0
     skipped = 0
@@ -204,22 +295,42 @@ def check_patches(repo, patches, flags, use_apply, dry_run):
 
     repo_directory = lib_directory + repo["name"]
 
-    for patch in patches:
-        try:
-            os.chdir(lib_directory)
-        except FileNotFoundError:
-            os.mkdir(lib_directory)
-            os.chdir(lib_directory)
+    # Only clone and check repos that have the files the patches touch.
+    repo_files = None
+    if set(flags) <= {"--signoff"}:
+        repo_files = get_repo_files(repo["name"])
+    if repo_files is not None:
+        patches, skip_patches = filter_patches(patches, repo_files)
+        for patch in skip_patches:
+            print(
+                "   . Skipping {}: {} does not match its files".format(
+                    repo["name"], patch
+                )
+            )
+        skipped += len(skip_patches)
+        if not patches:
+            return [applied, skipped, failed]
 
+    if os.path.isdir(repo_directory):
+        # Reuse the previous checkout, discarding any patches left on it.
         try:
-            git.clone(repo["url"])
-        except sh.ErrorReturnCode_128 as err:
-            if b"already exists" in err.stderr:
-                pass
-            else:
-                raise RuntimeError(err.stderr) from None
-        os.chdir(repo_directory)
+            if os.path.isdir(repo_directory + "/.git/rebase-apply"):
+                git.am("--abort", _cwd=repo_directory)
+            git.fetch("--depth=1", "origin", _cwd=repo_directory)
+            git.reset("--hard", "origin/HEAD", _cwd=repo_directory)
+            git.clean("-fdx", _cwd=repo_directory)
+        except sh.ErrorReturnCode:
+            # The checkout can't be updated, e.g. the default branch was
+            # renamed or the clone is broken, so start over with a new one.
+            shutil.rmtree(repo_directory)
+
+    if not os.path.isdir(repo_directory):
+        try:
+            git.clone("--depth=1", "--single-branch", repo["url"], _cwd=lib_directory)
+        except sh.ErrorReturnCode as err:
+            raise RuntimeError(err.stderr) from None
 
+    for patch in patches:
         patch_filepath = patch_directory + patch
 
         try:
@@ -228,7 +339,7 @@ def check_patches(repo, patches, flags, use_apply, dry_run):
                 for flag in flags:
                     if not flag in ("--apply", "--signoff"):
                         check_flags.append(flag)
-            git.apply(check_flags, patch_filepath)
+            git.apply(check_flags, patch_filepath, _cwd=repo_directory)
             run_apply = True
         except sh.ErrorReturnCode_1 as err:
             run_apply = False
@@ -241,26 +352,14 @@ def check_patches(repo, patches, flags, use_apply, dry_run):
                 failed += 1
                 error_str = str(err.stderr, encoding="utf-8").replace("\n", " ")
                 error_start = error_str.rfind("error:") + 7
-                check_errors.append(
-                    dict(
-                        repo_name=repo["name"],
-                        patch_name=patch,
-                        error=error_str[error_start:],
-                    )
-                )
+                add_error(check_errors, repo["name"], patch, error_str[error_start:])
 
         except sh.ErrorReturnCode as err:
             run_apply = False
             failed += 1
             error_str = str(err.stderr, encoding="utf-8").replace("\n", " ")
             error_start = error_str.rfind("error:") + 7
-            check_errors.append(
-                dict(
-                    repo_name=repo["name"],
-                    patch_name=patch,
-                    error=error_str[error_start:],
-                )
-            )
+            add_error(check_errors, repo["name"], patch, error_str[error_start:])
 
         if run_apply and not dry_run:
             result = apply_patch(
@@ -324,34 +423,29 @@ if __name__ == "__main__":
     apply_errors = []
     stats = [0, 0, 0]
 
-    print(".... Deleting any previously cloned libraries")
-    try:
-        libs = os.listdir(path=lib_directory)
-        for lib in libs:
-            shutil.rmtree(lib_directory + lib)
-    except FileNotFoundError:
-        pass
+    os.makedirs(lib_directory, exist_ok=True)
 
     repos = get_repo_list()
     print(".... Running Patch Checks On", len(repos), "Repos ....")
 
-    for repository in repos:
-        results = check_patches(
-            repository,
-            run_patches,
-            cmd_flags,
-            cli_args.use_apply,
-            cli_args.dry_run
-        )
-        for k in range(3):
-            stats[k] += results[k]
+    process_repo = functools.partial(
+        check_patches,
+        patches=run_patches,
+        flags=cmd_flags,
+        use_apply=cli_args.use_apply,
+        dry_run=cli_args.dry_run,
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=cli_args.jobs) as executor:
+        for results in executor.map(process_repo, repos):
+            for k in range(3):
+                stats[k] += results[k]
 
     print(".... Patch Updates Completed ....")
     print(".... Patches Applied:", stats[0])
     print(".... Patches Skipped:", stats[1])
     print(".... Patches Failed:", stats[2], "\n")
     print(".... Patch Check Failure Report ....")
-    if len(check_errors) > 0:
+    if check_errors:
         for error in check_errors:
             print(
                 ">> Repo: {0}\tPatch: {1}\n   Error: {2}".format(
@@ -362,7 +456,7 @@ if __name__ == "__main__":
         print("No Failures")
     print("\n")
     print(".... Patch Apply Failure Report ....")
-    if len(apply_errors) > 0:
+    if apply_errors:
         for error in apply_errors:
             print(
                 ">> Repo: {0}\tPatch: {1}\n   Error: {2}".format(
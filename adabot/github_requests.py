@@ -31,19 +31,46 @@ import time
 import traceback
 
 import requests
+from requests.adapters import HTTPAdapter
 import requests_cache
+from urllib3.util.retry import Retry
+
+from adabot import pypi_requests
 
 TIMEOUT = 60
+POOL_SIZE = 16
+
+
+def _make_session():
+    """A session that keeps connections to GitHub alive between requests,
+    and retries requests that fail to connect.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+SESSION = _make_session()
 
 
 def setup_cache(expire_after=7200):
     """Sets up a cache for requests."""
+    global SESSION  # pylint: disable=global-statement
     requests_cache.install_cache(
         cache_name="github_cache",
         backend="sqlite",
         expire_after=expire_after,
         allowable_codes=(200, 404),
     )
+    # `install_cache` patches `requests.Session`, so the shared sessions must
+    # be recreated to be cached.
+    SESSION = _make_session()
+    pypi_requests.reset_session()
 
 
 def _fix_url(url):
@@ -78,7 +105,7 @@ def _fix_kwargs(kwargs):
 def request(method, url, **kwargs):
     """Processes request for `url`."""
     try:
-        response = getattr(requests, method)(
+        response = getattr(SESSION, method)(
             _fix_url(url), timeout=TIMEOUT, **_fix_kwargs(kwargs)
         )
         from_cache = getattr(response, "from_cache", False)
@@ -25,6 +25,35 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 16
+
+
+def _make_session():
+    """A session that keeps connections to PyPI alive between requests,
+    and retries requests that fail to connect.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+SESSION = _make_session()
+
+
+def reset_session():
+    """Recreates the shared session, so that it picks up a cache installed
+    with `requests_cache.install_cache`.
+    """
+    global SESSION  # pylint: disable=global-statement
+    SESSION = _make_session()
 
 
 def _fix_url(url):
@@ -35,4 +64,4 @@ def _fix_url(url):
 
 def get(url, **kwargs):
     """Process a GET request from pypi.org"""
-    return requests.get(_fix_url(url), timeout=30, **kwargs)
+    return SESSION.get(_fix_url(url), timeout=30, **kwargs)
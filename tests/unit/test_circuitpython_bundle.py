@@ -0,0 +1,261 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2021 Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Unit tests for 'adabot/circuitpython_bundle.py'"""
+
+import types
+
+import pytest  # pylint: disable=unused-import
+
+from adabot import circuitpython_bundle
+
+
+class MockRedis:
+    """Minimal stand-in for the `mget`/`pipeline` calls made on REDIS."""
+
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+        self.sets = []
+
+    def mget(self, keys):
+        """Return the stored values of `keys`, None when missing."""
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self):
+        """Return a pipeline that records sets until executed."""
+        return MockPipeline(self)
+
+
+class MockPipeline:
+    """Minimal stand-in for a Redis pipeline."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def set(self, key, value, **kwargs):
+        """Queue setting `key` to `value`."""
+        self.queued.append((key, value, kwargs))
+
+    def execute(self):
+        """Store the queued values."""
+        for key, value, kwargs in self.queued:
+            self.redis.data[key] = str(value).encode()
+            self.redis.sets.append((key, value, kwargs))
+        self.queued = []
+
+
+class MockGit:
+    """Returns `log_output` from `git.log`."""
+
+    def __init__(self, log_output):
+        self.log_output = log_output
+
+    def log(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """Write the canned log to `_out`."""
+        kwargs["_out"].write(self.log_output)
+
+
+def test_get_submodule_urls(tmp_path):
+    """Test 'get_submodule_urls'"""
+    gitmodules = tmp_path / ".gitmodules"
+    gitmodules.write_text(
+        '[submodule "libraries/drivers/foo"]\n'
+        "\tpath = libraries/drivers/foo\n"
+        "\turl = https://github.com/adafruit/Adafruit_CircuitPython_Foo.git\n"
+        '[submodule "libraries/helpers/bar"]\n'
+        "\tpath = libraries/helpers/bar\n"
+        "\turl = https://github.com/adafruit/Adafruit_CircuitPython_Bar.git\n"
+    )
+
+    assert circuitpython_bundle.get_submodule_urls(tmp_path) == {
+        "libraries/drivers/foo": (
+            "https://github.com/adafruit/Adafruit_CircuitPython_Foo.git"
+        ),
+        "libraries/helpers/bar": (
+            "https://github.com/adafruit/Adafruit_CircuitPython_Bar.git"
+        ),
+    }
+
+
+def test_get_submodule_urls_missing(tmp_path):
+    """Test 'get_submodule_urls' without a .gitmodules file"""
+    assert circuitpython_bundle.get_submodule_urls(tmp_path) == {}
+
+
+url_names = [
+    {
+        "id": "with .git",
+        "url": "https://github.com/adafruit/Adafruit_CircuitPython_Foo.git",
+        "expects": "Adafruit_CircuitPython_Foo",
+    },
+    {
+        "id": "without .git",
+        "url": "https://github.com/adafruit/Adafruit_CircuitPython_Foo",
+        "expects": "Adafruit_CircuitPython_Foo",
+    },
+]
+
+
+@pytest.mark.parametrize("urls", url_names, ids=[url["id"] for url in url_names])
+def test_repo_url_name(urls):
+    """Test 'repo_url_name'"""
+    assert circuitpython_bundle.repo_url_name(urls["url"]) == urls["expects"]
+
+
+def test_parse_submodule_diff():
+    """Test 'parse_submodule_diff'"""
+    diff = (
+        "diff --git a/libraries/drivers/foo b/libraries/drivers/foo\n"
+        "index ebaa770..641593f 160000\n"
+        "--- a/libraries/drivers/foo\n"
+        "+++ b/libraries/drivers/foo\n"
+        "@@ -1 +1 @@\n"
+        "-Subproject commit ebaa770c38c2c72a1364d7f6e3149a6eb6e01b9c\n"
+        "+Subproject commit 641593fd970c3225c1eb34ad5414ebc58d735549\n"
+        "diff --git a/libraries/helpers/bar b/libraries/helpers/bar\n"
+        "new file mode 160000\n"
+        "index 0000000..e55e476\n"
+        "--- /dev/null\n"
+        "+++ b/libraries/helpers/bar\n"
+        "@@ -0,0 +1 @@\n"
+        "+Subproject commit e55e47672ec15941f8d6852b311de4bfe5c31209\n"
+        "diff --git a/circuitpython_library_list.md b/circuitpython_library_list.md\n"
+        "index 1234567..89abcde 100644\n"
+        "--- a/circuitpython_library_list.md\n"
+        "+++ b/circuitpython_library_list.md\n"
+        "@@ -1 +1,2 @@\n"
+        "+* [Bar](https://github.com/adafruit/Adafruit_CircuitPython_Bar.git)\n"
+    )
+
+    assert circuitpython_bundle.parse_submodule_diff(diff) == [
+        ("libraries/drivers/foo", "ebaa770..641593f"),
+        ("libraries/helpers/bar", "0000000..e55e476"),
+    ]
+
+
+def test_parse_submodule_log():
+    """Test 'parse_submodule_log'"""
+    diff = (
+        "Submodule libraries/drivers/foo ebaa770..641593f:\n"
+        "  > three\n"
+        "  > two\n"
+        "Submodule libraries/helpers/bar 87e3089...e55e476 (rewind):\n"
+        "  < four\n"
+    )
+
+    assert circuitpython_bundle.parse_submodule_log(diff) == {
+        "libraries/drivers/foo": ("ebaa770", "641593f", "  > three\n  > two"),
+        "libraries/helpers/bar": ("87e3089", "e55e476", "  < four"),
+    }
+
+
+def test_contributors_empty_email(monkeypatch):
+    """Test 'get_contributors' when the last commit's committer email is empty"""
+    monkeypatch.setattr(
+        circuitpython_bundle, "REDIS", MockRedis({"github_username:a@b": b"alice"})
+    )
+    monkeypatch.setattr(
+        circuitpython_bundle,
+        "git",
+        MockGit("sha1\0a@b\0a@b\0sha2\0a@b\0\0"),
+    )
+    monkeypatch.setattr(
+        circuitpython_bundle,
+        "get_github_commit",
+        lambda repo, sha: {"author": None, "committer": None},
+    )
+
+    contributors = circuitpython_bundle.get_contributors("adafruit/foo", "a..b", ".")
+
+    assert contributors == {"alice": 2}
+
+
+def test_get_contributors_batching(monkeypatch):
+    """Test that 'get_contributors' only looks up one commit per unknown email"""
+    redis = MockRedis(
+        {"github_username:a@x": b"alice", "github_username:c@x": b"carol"}
+    )
+    github_commits = {
+        "c1": {"author": {"login": "alice"}, "committer": {"login": "web-flow"}},
+        "c2": {"author": {"login": "bob"}, "committer": {"login": "bob"}},
+    }
+    lookups = []
+
+    def mock_github_commit(repo, sha):
+        lookups.append((repo, sha))
+        return github_commits[sha]
+
+    monkeypatch.setattr(circuitpython_bundle, "REDIS", redis)
+    monkeypatch.setattr(circuitpython_bundle, "get_github_commit", mock_github_commit)
+    monkeypatch.setattr(
+        circuitpython_bundle,
+        "git",
+        MockGit(
+            # cached author with a GitHub web committer
+            "c1\0a@x\0noreply@github.com\0"
+            # uncached author == committer, looked up once for both commits
+            "c2\0b@x\0b@x\0"
+            "c3\0b@x\0b@x\0"
+            # cached author and committer
+            "c4\0c@x\0a@x\0"
+        ),
+    )
+
+    contributors = circuitpython_bundle.get_contributors("adafruit/foo", "a..b", ".")
+
+    assert contributors == {"alice": 2, "bob": 2, "carol": 1}
+    assert sorted(lookups) == [("adafruit/foo", "c1"), ("adafruit/foo", "c2")]
+    assert redis.data["github_username:b@x"] == b"bob"
+    assert redis.data["github_username:noreply@github.com"] == b"web-flow"
+
+
+def test_get_pypi_status(monkeypatch):
+    """Test that 'get_pypi_status' only asks PyPI about uncached libraries,
+    and only caches definite answers"""
+    redis = MockRedis({"pypi:cached-on": b"1", "pypi:cached-off": b"0"})
+    status_codes = {"new-on": 200, "new-off": 404, "rate-limited": 429}
+    pypi_lookups = []
+
+    def mock_pypi_get(url):
+        name = url.split("/")[2]
+        pypi_lookups.append(name)
+        return types.SimpleNamespace(status_code=status_codes[name])
+
+    monkeypatch.setattr(circuitpython_bundle, "REDIS", redis)
+    monkeypatch.setattr(circuitpython_bundle.pypi, "get", mock_pypi_get)
+
+    assert circuitpython_bundle.get_pypi_status(
+        ["cached-on", "new-on", "cached-off", "new-off", "rate-limited"]
+    ) == {
+        "cached-on": True,
+        "new-on": True,
+        "cached-off": False,
+        "new-off": False,
+        "rate-limited": False,
+    }
+    assert pypi_lookups == ["new-on", "new-off", "rate-limited"]
+    assert redis.sets == [
+        ("pypi:new-on", 1, {"ex": circuitpython_bundle.PYPI_CACHE_TTL}),
+        ("pypi:new-off", 0, {"ex": circuitpython_bundle.PYPI_CACHE_TTL}),
+    ]
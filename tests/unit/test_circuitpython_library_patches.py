@@ -0,0 +1,186 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2021 Adafruit Industries
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Unit tests for 'adabot/circuitpython_library_patches.py'"""
+
+import pytest  # pylint: disable=unused-import
+
+from adabot import circuitpython_library_patches
+
+patch_subjects = [
+    {
+        "id": "single patch",
+        "content": "From abc\nSubject: [PATCH] Moved CI to Python 3.7\n\n---\n",
+        "expects": "Moved CI to Python 3.7",
+    },
+    {
+        "id": "numbered patch",
+        "content": "From abc\nSubject: [PATCH 2/5] Added pre-commit\n\n---\n",
+        "expects": "Added pre-commit",
+    },
+    {
+        "id": "folded subject",
+        "content": (
+            "From abc\nSubject: [PATCH] Removed pylint process\n from workflow\n\n---\n"
+        ),
+        "expects": "Removed pylint process from workflow",
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "subjects", patch_subjects, ids=[subject["id"] for subject in patch_subjects]
+)
+def test_get_patch_subject(subjects, tmp_path):
+    """Test 'get_patch_subject'"""
+    patch_file = tmp_path / "0001-test.patch"
+    patch_file.write_text(subjects["content"])
+
+    assert circuitpython_library_patches.get_patch_subject(str(patch_file)) == (
+        subjects["expects"]
+    )
+
+
+def test_get_patch_targets(tmp_path):
+    """Test 'get_patch_targets'"""
+    patch_file = tmp_path / "0001-test.patch"
+    patch_file.write_text(
+        "diff --git a/.github/workflows/build.yml b/.github/workflows/build.yml\n"
+        "index 0ab7182..c4c975d 100644\n"
+        "--- a/.github/workflows/build.yml\n"
+        "+++ b/.github/workflows/build.yml\n"
+        "diff --git a/.pre-commit-config.yaml b/.pre-commit-config.yaml\n"
+        "new file mode 100644\n"
+        "index 0000000..354c761\n"
+        "--- /dev/null\n"
+        "+++ b/.pre-commit-config.yaml\n"
+    )
+
+    assert circuitpython_library_patches.get_patch_targets(str(patch_file)) == (
+        frozenset({".github/workflows/build.yml"}),
+        frozenset({".pre-commit-config.yaml"}),
+    )
+
+
+def test_filter_patches(monkeypatch, tmp_path):
+    """Test 'filter_patches'"""
+    patches = {
+        "0001-Modified-build.patch": (
+            "diff --git a/.github/workflows/build.yml b/.github/workflows/build.yml\n"
+            "--- a/.github/workflows/build.yml\n"
+            "+++ b/.github/workflows/build.yml\n"
+        ),
+        "0002-Modified-missing-file.patch": (
+            "diff --git a/.pylintrc b/.pylintrc\n"
+            "--- a/.pylintrc\n"
+            "+++ b/.pylintrc\n"
+        ),
+        "0003-Created-existing-file.patch": (
+            "diff --git a/README.rst b/README.rst\n"
+            "new file mode 100644\n"
+            "--- /dev/null\n"
+            "+++ b/README.rst\n"
+        ),
+        "0004-Created-pre-commit.patch": (
+            "diff --git a/.pre-commit-config.yaml b/.pre-commit-config.yaml\n"
+            "new file mode 100644\n"
+            "--- /dev/null\n"
+            "+++ b/.pre-commit-config.yaml\n"
+        ),
+        "0005-Modified-pre-commit.patch": (
+            "diff --git a/.pre-commit-config.yaml b/.pre-commit-config.yaml\n"
+            "--- a/.pre-commit-config.yaml\n"
+            "+++ b/.pre-commit-config.yaml\n"
+        ),
+    }
+    for name, content in patches.items():
+        (tmp_path / name).write_text(content)
+    monkeypatch.setattr(
+        circuitpython_library_patches, "patch_directory", str(tmp_path) + "/"
+    )
+
+    assert circuitpython_library_patches.filter_patches(
+        list(patches), {".github/workflows/build.yml", "README.rst"}
+    ) == (
+        [
+            "0001-Modified-build.patch",
+            "0004-Created-pre-commit.patch",
+            "0005-Modified-pre-commit.patch",
+        ],
+        ["0002-Modified-missing-file.patch", "0003-Created-existing-file.patch"],
+    )
+
+
+class CloneCalled(Exception):
+    """Raised by 'MockGit.clone' to stop 'check_patches' before checking."""
+
+
+class MockGit:  # pylint: disable=too-few-public-methods
+    """Stand-in for 'git' that stops at 'clone'."""
+
+    @staticmethod
+    def clone(*args, **kwargs):
+        """Stop 'check_patches' when it clones the repo."""
+        raise CloneCalled
+
+
+@pytest.mark.parametrize(
+    "flags, prechecked",
+    [(["--signoff"], True), (["--signoff", "-p2"], False)],
+    ids=["signoff", "path flag"],
+)
+def test_check_patches_precheck(monkeypatch, tmp_path, flags, prechecked):
+    """Test that 'check_patches' only skips patches using the Trees API
+    when no flags can change the files a patch touches"""
+    (tmp_path / "0001-Modified-pylintrc.patch").write_text(
+        "diff --git a/.pylintrc b/.pylintrc\n--- a/.pylintrc\n+++ b/.pylintrc\n"
+    )
+    tree_lookups = []
+
+    def mock_get_repo_files(repo_name):
+        tree_lookups.append(repo_name)
+        return frozenset({"README.rst"})
+
+    monkeypatch.setattr(
+        circuitpython_library_patches, "patch_directory", str(tmp_path) + "/"
+    )
+    monkeypatch.setattr(
+        circuitpython_library_patches, "lib_directory", str(tmp_path) + "/"
+    )
+    monkeypatch.setattr(
+        circuitpython_library_patches, "get_repo_files", mock_get_repo_files
+    )
+    monkeypatch.setattr(circuitpython_library_patches, "git", MockGit)
+    repo = {"name": "Adafruit_CircuitPython_Test", "url": "https://example.com"}
+
+    if prechecked:
+        assert circuitpython_library_patches.check_patches(
+            repo, ["0001-Modified-pylintrc.patch"], flags, False, True
+        ) == [0, 1, 0]
+        assert tree_lookups == [repo["name"]]
+    else:
+        with pytest.raises(CloneCalled):
+            circuitpython_library_patches.check_patches(
+                repo, ["0001-Modified-pylintrc.patch"], flags, False, True
+            )
+        assert not tree_lookups
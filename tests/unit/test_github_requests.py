@@ -27,6 +27,7 @@
 import pytest  # pylint: disable=unused-import
 
 from adabot import github_requests
+from adabot import pypi_requests
 
 
 def test_fix_url():
@@ -41,3 +42,29 @@ def test_fix_kwargs():
 
     assert "headers" in dummy_kwargs
     assert "Accept" in dummy_kwargs["headers"]
+
+
+def test_session_adapter():
+    """Test that the shared session pools and retries GitHub connections."""
+    adapter = github_requests.SESSION.get_adapter("https://api.github.com")
+
+    assert adapter.max_retries.total == 3
+    assert (
+        adapter.poolmanager.connection_pool_kw["maxsize"] == github_requests.POOL_SIZE
+    )
+
+
+def test_setup_cache_sessions(monkeypatch):
+    """Test that 'setup_cache' recreates the GitHub and PyPI sessions."""
+    github_session = github_requests.SESSION
+    pypi_session = pypi_requests.SESSION
+    monkeypatch.setattr(github_requests, "SESSION", github_session)
+    monkeypatch.setattr(pypi_requests, "SESSION", pypi_session)
+    monkeypatch.setattr(
+        github_requests.requests_cache, "install_cache", lambda **kwargs: None
+    )
+
+    github_requests.setup_cache(60)
+
+    assert github_requests.SESSION is not github_session
+    assert pypi_requests.SESSION is not pypi_session
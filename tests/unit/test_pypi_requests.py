@@ -31,3 +31,11 @@ def test_fix_url():
     """Test URL fixing function."""
     url = pypi_requests._fix_url("/test")  # pylint: disable=protected-access
     assert url == "https://pypi.org/test"
+
+
+def test_session_adapter():
+    """Test that the shared session pools and retries PyPI connections."""
+    adapter = pypi_requests.SESSION.get_adapter("https://pypi.org")
+
+    assert adapter.max_retries.total == 3
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == pypi_requests.POOL_SIZE